@@ -1,7 +1,14 @@
 import os
 import json
+import queue
 import shutil
+import signal
+import socket
+import argparse
+import threading
 import subprocess
+import time
+import stat
 from datetime import datetime
 import pytz
 from tzlocal import get_localzone_name
@@ -10,24 +17,147 @@ from pathlib import Path
 from PIL import Image
 from typing import Optional
 
+# inotify is optional, watch mode falls back to polling without it
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
 
-# Load metadata
-with open("input/memories_history.json", "r", encoding="utf-8") as f:
-    metadata = json.load(f)["Saved Media"]
+
+# Metadata index for the export being processed (mid -> "Saved Media" entry)
+metadata = {}
 
 tf = TimezoneFinder()
 system_timezone = get_localzone_name()
 
+# Shared `exiftool -stay_open` process, None means one exiftool run per command
+exiftool_session = None
+EXIFTOOL_TIMEOUT = 120
 
-def get_metadata(filename):
-    for m in metadata:
-        if "mid=" in m["Download Link"]:
+
+def load_metadata(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        saved_media = json.load(f)["Saved Media"]
+
+    # Index by mid so lookups don't rescan the whole list for every file
+    index = {}
+    for m in saved_media:
+        if "mid=" in m.get("Download Link", ""):
             mid = m["Download Link"].split("mid=")[1].split("&")[0]
-            if mid in filename:
-                return m
+            index.setdefault(mid, m)
+    return index
+
+
+def get_metadata(filename):
+    # Filenames look like "2023-05-21_<mid>-main.jpg"
+    mid = filename.split("_", 1)[-1].split("-main")[0].split("-overlay")[0]
+    if mid in metadata:
+        return metadata[mid]
+    for entry_mid, m in metadata.items():
+        if entry_mid in filename:
+            return m
     return None
 
 
+class ToolError(RuntimeError):
+    """An ffmpeg or exiftool command failed, so its output can't be trusted."""
+
+
+def run_command(cmd, check=False, **kwargs):
+    # Own session so Ctrl+C / SIGTERM aimed at the script doesn't kill tools mid-write
+    result = subprocess.run(cmd, stdin=subprocess.DEVNULL, start_new_session=True, **kwargs)
+    if check and result.returncode != 0:
+        raise ToolError(f"{cmd[0]} failed with exit code {result.returncode} → {cmd[-1]}")
+    return result
+
+
+class ExifToolSession:
+    """One long-running `exiftool -stay_open` process that accepts commands over stdin."""
+
+    def __init__(self, executable="exiftool"):
+        self.process = subprocess.Popen(
+            [executable, "-stay_open", "True", "-@", "-",
+             "-common_args", "-charset", "filename=utf8"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            start_new_session=True,
+        )
+        self.counter = 0
+
+        # Read stdout on a thread so execute() can give up on a hung command
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_output, daemon=True).start()
+
+    def _read_output(self):
+        for line in self.process.stdout:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def execute(self, args, timeout=EXIFTOOL_TIMEOUT):
+        self.counter += 1
+        ready = f"{{ready{self.counter}}}"
+        deadline = time.time() + timeout
+        self.process.stdin.write("\n".join(args) + f"\n-execute{self.counter}\n")
+        self.process.stdin.flush()
+        failed = False
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                raise TimeoutError(f"exiftool did not respond within {timeout}s")
+            if line is None:
+                raise RuntimeError("exiftool session exited unexpectedly")
+            if "weren't updated due to errors" in line:
+                failed = True
+            if line.strip() == ready:
+                if failed:
+                    raise ToolError(f"exiftool failed to update → {args[-1]}")
+                return
+
+    def close(self):
+        try:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+
+
+def start_exiftool_session():
+    global exiftool_session
+    try:
+        exiftool_session = ExifToolSession()
+    except OSError:
+        exiftool_session = None
+    return exiftool_session
+
+
+def stop_exiftool_session():
+    global exiftool_session
+    if exiftool_session:
+        exiftool_session.close()
+    exiftool_session = None
+
+
+def run_exiftool(cmd):
+    global exiftool_session
+    # Arguments go over stdin one per line, so a newline would break the protocol
+    if exiftool_session and not any("\n" in arg or "\r" in arg for arg in cmd):
+        try:
+            exiftool_session.execute(cmd[1:])
+            return
+        except ToolError:
+            raise
+        except Exception:
+            # Session died or hung, drop it and use a one-off exiftool run instead
+            exiftool_session.process.kill()
+            exiftool_session = None
+    run_command(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
 def adjust_time(utc_time, gps_coords, target_tz=None):
     try:
         lat, lon = map(float, gps_coords.split(", "))
@@ -60,7 +190,9 @@ def format_dms(lat, lon):
 
 def update_metadata(file_path, date_time, gps_coords=None, only_modified=False):
     current_time = datetime.now().strftime("%Y:%m:%d %H:%M:%S")
-    if not only_modified:
+    # ExifTool can't write MP3 (ID3) files, so voice messages only get filesystem times
+    writable = Path(file_path).suffix.lower() != ".mp3"
+    if writable and not only_modified:
         clean_cmd = [
             "exiftool",
             "-overwrite_original",
@@ -92,7 +224,7 @@ def update_metadata(file_path, date_time, gps_coords=None, only_modified=False):
             "-Microsoft:DateAcquired=",
             str(file_path),
         ]
-        subprocess.run(clean_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        run_exiftool(clean_cmd)
 
     set_cmd = [
         "exiftool",
@@ -138,7 +270,8 @@ def update_metadata(file_path, date_time, gps_coords=None, only_modified=False):
             )
 
     set_cmd.append(str(file_path))
-    subprocess.run(set_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if writable:
+        run_exiftool(set_cmd)
 
     try:
         timestamp = datetime.strptime(date_time, "%Y:%m:%d %H:%M:%S").timestamp()
@@ -176,7 +309,7 @@ def apply_overlay_video(base_path, overlay_path, output_path):
             "-of", "csv=p=0",
             str(base_path)
         ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        result = run_command(probe_cmd, capture_output=True, text=True)
 
         lines = result.stdout.strip().splitlines()
         if not lines:
@@ -194,6 +327,8 @@ def apply_overlay_video(base_path, overlay_path, output_path):
         else:
             return apply_overlay_portrait(base_path, overlay_path, output_path)
 
+    except ToolError:
+        raise
     except Exception:
         return False
 
@@ -205,7 +340,7 @@ def get_video_resolution(video_path):
         "-show_entries", "stream=width,height",
         "-of", "json", str(video_path)
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
     info = json.loads(result.stdout)
     width = info['streams'][0]['width']
     height = info['streams'][0]['height']
@@ -216,7 +351,7 @@ def apply_overlay_landscape(base_path, overlay_path, output_path):
     try:
         width, height = get_video_resolution(base_path)
 
-        subprocess.run(
+        run_command(
             [
                 "ffmpeg",
                 "-i", str(base_path),
@@ -233,11 +368,14 @@ def apply_overlay_landscape(base_path, overlay_path, output_path):
                 "-y",
                 str(output_path)
             ],
+            check=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL
         )
         return output_path.exists()
 
+    except ToolError:
+        raise
     except Exception as e:
         print(f"   Overlay video failed (landscape) for {base_path.name}: {e}")
         return False
@@ -254,7 +392,7 @@ def apply_overlay_portrait(base_path, overlay_path, output_path):
             "-of", "csv=p=0",
             str(base_path)
         ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        result = run_command(probe_cmd, capture_output=True, text=True)
         lines = result.stdout.strip().splitlines()
         width, height = lines[0].split(",")
 
@@ -268,7 +406,7 @@ def apply_overlay_portrait(base_path, overlay_path, output_path):
             "-y",
             str(resized_overlay)
         ]
-        subprocess.run(resize_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        run_command(resize_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         # Apply overlay directly
         overlay_cmd = [
@@ -281,13 +419,15 @@ def apply_overlay_portrait(base_path, overlay_path, output_path):
             "-y",
             str(output_path)
         ]
-        subprocess.run(overlay_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        run_command(overlay_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         if resized_overlay.exists():
             os.remove(resized_overlay)
 
         return output_path.exists()
 
+    except ToolError:
+        raise
     except Exception as e:
         print(f"   Overlay video failed (portrait) for {base_path.name}: {e}")
         return False
@@ -345,9 +485,10 @@ def merge_video_clips(groups, input_dir, output_dir_location, output_dir_system)
             print(f"   System timezone used → {system_timezone}")
         print(f"   Final datetime → {gps_local_str}")
 
-        subprocess.run(
+        run_command(
             ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_list),
-             "-c", "copy", str(merged_path_location)],
+             "-c", "copy", "-y", str(merged_path_location)],
+            check=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -364,9 +505,10 @@ def merge_video_clips(groups, input_dir, output_dir_location, output_dir_system)
                 update_metadata(overlay_output_location, gps_local_str, gps_coords)
                 print(f"   Overlay version added → {overlay_output_location.name}")
 
-        subprocess.run(
+        run_command(
             ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_list),
-             "-c", "copy", str(merged_path_system)],
+             "-c", "copy", "-y", str(merged_path_system)],
+            check=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -387,10 +529,12 @@ def merge_video_clips(groups, input_dir, output_dir_location, output_dir_system)
     return used_filenames
 
 
-def process_memories(): 
-    input_dir = Path("input/memories")
-    output_dir_mem = Path("output/memories location time")
-    output_dir_system = Path("output/memories system time")
+def process_memories(input_root=Path("input"), output_root=Path("output")):
+    input_dir = input_root / "memories"
+    output_dir_mem = output_root / "memories location time"
+    output_dir_system = output_root / "memories system time"
+    if not input_dir.exists():
+        return
     output_dir_mem.mkdir(parents=True, exist_ok=True)
     output_dir_system.mkdir(parents=True, exist_ok=True)
 
@@ -530,7 +674,7 @@ def process_memories():
 # Detect if file has a video stream
 def has_video_stream(file_path: Path) -> bool:
     try:
-        result = subprocess.run([
+        result = run_command([
             "ffprobe", "-v", "error",
             "-select_streams", "v:0",
             "-show_entries", "stream=codec_type",
@@ -545,7 +689,7 @@ def has_video_stream(file_path: Path) -> bool:
 # Detect if file has an audio stream
 def has_audio_stream(file_path: Path) -> bool:
     try:
-        result = subprocess.run([
+        result = run_command([
             "ffprobe", "-v", "error",
             "-select_streams", "a:0",
             "-show_entries", "stream=codec_type",
@@ -559,18 +703,22 @@ def has_audio_stream(file_path: Path) -> bool:
 
 def convert_to_mp3(input_file: Path, output_file: Path):
     try:
-        subprocess.run([
-            "ffmpeg", "-i", str(input_file), "-vn", "-acodec", "libmp3lame", str(output_file)
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        run_command([
+            "ffmpeg", "-i", str(input_file), "-vn", "-acodec", "libmp3lame", "-y", str(output_file)
+        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return output_file.exists()
+    except ToolError:
+        raise
     except Exception:
         return False
 
 
-def process_chat_media():
-    input_dir = Path("input/chat_media")
-    output_dir = Path("output/chat media")
-    voice_dir = Path("output/chat media voice messages")
+def process_chat_media(input_root=Path("input"), output_root=Path("output")):
+    input_dir = input_root / "chat_media"
+    output_dir = output_root / "chat media"
+    voice_dir = output_root / "chat media voice messages"
+    if not input_dir.exists():
+        return
     output_dir.mkdir(parents=True, exist_ok=True)
     voice_dir.mkdir(parents=True, exist_ok=True)
     date_counter = {}
@@ -648,9 +796,401 @@ def process_chat_media():
                     print(f"→  Failed to convert voice message → {file.name}")
 
 
+def process_export(input_root=Path("input"), output_root=Path("output")):
+    global metadata
+    metadata = load_metadata(input_root / "memories_history.json")
+    process_chat_media(input_root, output_root)
+    process_memories(input_root, output_root)
+
+
+# ----- WATCH MODE -----
+
+DONE_MARKER = ".processed"
+IN_PROGRESS_MARKER = ".in_progress"
+
+daemon_stats = {
+    "started": None,
+    "queue_depth": 0,
+    "active_job": None,
+    "jobs_completed": 0,
+    "jobs_failed": 0,
+    "files_processed": 0,
+    # Time spent on completed jobs only, so failures don't skew throughput
+    "busy_seconds": 0.0,
+    "last_failure": None,
+}
+daemon_stats_lock = threading.Lock()
+
+# Shared between the scanner and the worker, guarded by daemon_stats_lock
+in_flight_exports = set()
+failed_exports = {}
+
+
+def count_export_files(export_dir):
+    total = 0
+    for sub in ("memories", "chat_media"):
+        folder = export_dir / sub
+        if folder.exists():
+            total += sum(1 for f in folder.iterdir() if f.is_file())
+    return total
+
+
+def export_signature(export_dir):
+    # File count, total size and newest mtime; stable across scans means the copy finished
+    count, size, newest = 0, 0, 0
+    for root, _, files in os.walk(export_dir):
+        for name in files:
+            try:
+                info = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            count += 1
+            size += info.st_size
+            newest = max(newest, info.st_mtime_ns)
+    return [count, size, newest]
+
+
+def folder_identity(export_dir):
+    # Cheap check for a replaced or re-dropped export folder
+    info = export_dir.stat()
+    return info.st_ino, info.st_mtime_ns
+
+
+def read_done_signature(job_output):
+    try:
+        with open(job_output / DONE_MARKER, "r", encoding="utf-8") as f:
+            return json.load(f).get("signature")
+    except (OSError, ValueError):
+        return None
+
+
+def get_daemon_status():
+    with daemon_stats_lock:
+        status = dict(daemon_stats)
+    busy = status.pop("busy_seconds")
+    started = status.pop("started")
+    status["uptime_seconds"] = round(time.time() - started, 1) if started else 0.0
+    status["files_per_minute"] = round(status["files_processed"] / busy * 60, 2) if busy else 0.0
+    status["seconds_per_job"] = round(busy / status["jobs_completed"], 1) if status["jobs_completed"] else 0.0
+    return status
+
+
+def prepare_job_output(job_output):
+    # Only clear folders watch mode created itself, never anything else at that path
+    if job_output.exists():
+        if not ((job_output / IN_PROGRESS_MARKER).exists() or (job_output / DONE_MARKER).exists()):
+            raise RuntimeError(f"{job_output} already exists and wasn't created by watch mode")
+        shutil.rmtree(job_output)
+    job_output.mkdir(parents=True)
+    (job_output / IN_PROGRESS_MARKER).touch()
+
+
+def job_worker(jobs, output_root):
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        export_dir, signature = job
+
+        with daemon_stats_lock:
+            daemon_stats["queue_depth"] = jobs.qsize()
+            daemon_stats["active_job"] = export_dir.name
+
+        start = time.time()
+        file_count = 0
+        error = None
+        try:
+            job_output = output_root / export_dir.name
+            file_count = count_export_files(export_dir)
+            print(f"\n→  Starting export job → {export_dir.name} ({file_count} files)")
+            prepare_job_output(job_output)
+            process_export(export_dir, job_output)
+            with open(job_output / DONE_MARKER, "w", encoding="utf-8") as f:
+                json.dump({
+                    "files": file_count,
+                    "finished": datetime.now().isoformat(),
+                    "signature": signature,
+                }, f)
+            (job_output / IN_PROGRESS_MARKER).unlink()
+            print(f"\n→  Finished export job → {export_dir.name} in {time.time() - start:.1f}s")
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"\n→  Export job failed → {export_dir.name}: {error}")
+
+        with daemon_stats_lock:
+            daemon_stats["active_job"] = None
+            in_flight_exports.discard(export_dir.name)
+            if error:
+                daemon_stats["jobs_failed"] += 1
+                daemon_stats["last_failure"] = {
+                    "export": export_dir.name,
+                    "error": error,
+                    "time": datetime.now().isoformat(),
+                }
+                # Retried once the export's contents change
+                failed_exports[export_dir.name] = signature
+            else:
+                daemon_stats["busy_seconds"] += time.time() - start
+                daemon_stats["jobs_completed"] += 1
+                daemon_stats["files_processed"] += file_count
+
+
+def bind_control_socket(socket_path):
+    # Only replace a stale socket left by a daemon that is no longer running
+    if os.path.lexists(socket_path):
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            raise OSError(f"{socket_path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+        else:
+            raise OSError(f"{socket_path} is in use by another running daemon")
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        server.listen()
+    except OSError:
+        server.close()
+        raise
+    return server
+
+
+def serve_control_socket(server):
+    # Every connection gets one JSON line with the current status
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            break
+        with conn:
+            try:
+                conn.sendall((json.dumps(get_daemon_status()) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+
+def query_control_socket(socket_path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(socket_path)
+    with client:
+        data = b""
+        while chunk := client.recv(4096):
+            data += chunk
+    print(json.dumps(json.loads(data), indent=2))
+
+
+def handle_sigterm(signum, frame):
+    # Stop the same way as Ctrl+C so the current job can finish
+    raise KeyboardInterrupt
+
+
+def watch_drop_dir(drop_dir, output_root, control_socket=None, poll_interval=5, settle_seconds=30):
+    drop_dir.mkdir(parents=True, exist_ok=True)
+    jobs = queue.Queue()
+    handled = {}   # queued, finished or failed exports -> folder_identity()
+    pending = {}   # exports still settling -> [signature, last change time]
+    watches = {}   # inotify watch -> (export name, folder)
+
+    with daemon_stats_lock:
+        daemon_stats["started"] = time.time()
+
+    server = None
+    if control_socket:
+        if hasattr(socket, "AF_UNIX"):
+            try:
+                server = bind_control_socket(control_socket)
+            except OSError as e:
+                print(f"→  Control socket unavailable → {e}")
+        else:
+            print("→  Control socket not supported on this system")
+
+    # Warm resources shared by every job: tf is already loaded, exiftool stays open
+    if start_exiftool_session():
+        print("→  Persistent exiftool session started")
+    else:
+        print("→  exiftool session unavailable, running exiftool per file")
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    worker = threading.Thread(target=job_worker, args=(jobs, output_root), daemon=True)
+    worker.start()
+
+    if server:
+        threading.Thread(target=serve_control_socket, args=(server,), daemon=True).start()
+        print(f"→  Control socket listening → {control_socket}")
+
+    notifier = None
+    if INotify is not None:
+        try:
+            notifier = INotify()
+            notifier.add_watch(str(drop_dir), inotify_flags.CREATE | inotify_flags.MOVED_TO)
+        except OSError:
+            notifier = None
+    print(f"→  Watching {drop_dir} ({'inotify' if notifier else 'polling'})")
+
+    def watch_export(name, folder):
+        # Any write inside a settling export restarts its settle timer
+        for root, _, _ in os.walk(folder):
+            try:
+                wd = notifier.add_watch(root, (
+                    inotify_flags.CREATE | inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE
+                    | inotify_flags.MOVED_TO | inotify_flags.MOVED_FROM | inotify_flags.DELETE
+                    | inotify_flags.ONLYDIR
+                ))
+            except OSError:
+                continue
+            watches[wd] = (name, Path(root))
+
+    def unwatch_export(name):
+        for wd, (owner, _) in list(watches.items()):
+            if owner == name:
+                del watches[wd]
+                try:
+                    notifier.rm_watch(wd)
+                except OSError:
+                    pass
+
+    try:
+        next_scan = 0
+        while True:
+            now = time.time()
+            if now >= next_scan:
+                next_scan = now + poll_interval
+                present = set()
+                for export_dir in sorted(drop_dir.iterdir()):
+                    if not export_dir.is_dir():
+                        continue
+                    name = export_dir.name
+                    present.add(name)
+                    with daemon_stats_lock:
+                        busy = name in in_flight_exports
+                        failed_signature = failed_exports.get(name)
+                    if busy:
+                        continue
+
+                    # Handled exports are only looked at again once they change
+                    if name in handled:
+                        if failed_signature is not None:
+                            if export_signature(export_dir) == failed_signature:
+                                continue
+                            with daemon_stats_lock:
+                                failed_exports.pop(name, None)
+                        elif handled[name] == folder_identity(export_dir):
+                            continue
+                        del handled[name]
+
+                    if name not in pending:
+                        if read_done_signature(output_root / name) == export_signature(export_dir):
+                            handled[name] = folder_identity(export_dir)
+                            continue
+                        pending[name] = [None if notifier else export_signature(export_dir), now]
+                        if notifier:
+                            watch_export(name, export_dir)
+                        continue
+
+                    # Wait until the export stops changing before queueing it
+                    if not notifier:
+                        signature = export_signature(export_dir)
+                        if signature != pending[name][0]:
+                            pending[name] = [signature, now]
+                            continue
+                    if now - pending[name][1] < settle_seconds:
+                        continue
+                    if not (export_dir / "memories_history.json").exists():
+                        continue
+
+                    del pending[name]
+                    if notifier:
+                        unwatch_export(name)
+                    handled[name] = folder_identity(export_dir)
+                    with daemon_stats_lock:
+                        in_flight_exports.add(name)
+                    print(f"\n→  Queued export → {name}")
+                    jobs.put((export_dir, export_signature(export_dir)))
+                    with daemon_stats_lock:
+                        daemon_stats["queue_depth"] = jobs.qsize()
+
+                # Forget exports that were removed from the drop folder
+                for name in set(handled) - present:
+                    del handled[name]
+                    with daemon_stats_lock:
+                        failed_exports.pop(name, None)
+                for name in set(pending) - present:
+                    del pending[name]
+                    if notifier:
+                        unwatch_export(name)
+
+            if notifier:
+                for event in notifier.read(timeout=max(0, int((next_scan - time.time()) * 1000))):
+                    owner = watches.get(event.wd)
+                    if owner is None:
+                        # Something new in the drop folder, scan right away
+                        next_scan = 0
+                        continue
+                    if event.mask & inotify_flags.IGNORED:
+                        del watches[event.wd]
+                        continue
+                    name, folder = owner
+                    if name in pending:
+                        pending[name][1] = time.time()
+                        if event.mask & inotify_flags.ISDIR and event.mask & (inotify_flags.CREATE | inotify_flags.MOVED_TO):
+                            watch_export(name, folder / event.name)
+            else:
+                time.sleep(max(0, next_scan - time.time()))
+    except KeyboardInterrupt:
+        print("\n→  Stopping watch mode, waiting for the current job to finish")
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        if notifier:
+            notifier.close()
+
+        # Drop jobs that haven't started, then let the worker finish its current one
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                break
+        jobs.put(None)
+        worker.join()
+
+        stop_exiftool_session()
+        if server:
+            server.close()
+            os.remove(control_socket)
+
+
 def main():
-    process_chat_media()
-    process_memories()
+    parser = argparse.ArgumentParser(description="Restore metadata for Snapchat Memories and Chat Media.")
+    parser.add_argument("--watch", metavar="DROP_DIR", help="run as a daemon and process each export folder dropped here")
+    parser.add_argument("--output", default="output", help="output folder (watch mode writes one subfolder per export)")
+    parser.add_argument("--control-socket", help="unix socket that reports queue depth and throughput")
+    parser.add_argument("--status", action="store_true", help="print the status of a running daemon and exit")
+    parser.add_argument("--poll-interval", type=float, default=5, help="seconds between drop folder scans")
+    parser.add_argument("--settle", type=float, default=30, help="seconds an export must stay unchanged before it is queued")
+    args = parser.parse_args()
+
+    if args.status:
+        if not args.control_socket:
+            parser.error("--status requires --control-socket")
+        query_control_socket(args.control_socket)
+        return
+
+    if args.watch:
+        drop_dir, output_root = Path(args.watch).resolve(), Path(args.output).resolve()
+        if drop_dir == output_root or drop_dir in output_root.parents or output_root in drop_dir.parents:
+            parser.error("--output can't be the --watch folder, be inside it, or contain it")
+        watch_drop_dir(Path(args.watch), Path(args.output), args.control_socket, args.poll_interval, args.settle)
+        return
+
+    start_exiftool_session()
+    try:
+        process_export(Path("input"), Path(args.output))
+    finally:
+        stop_exiftool_session()
 
 
 if __name__ == "__main__":